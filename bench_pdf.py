@@ -0,0 +1,174 @@
+import re
+import time
+import argparse
+import statistics
+from io import BytesIO
+
+from utils import get_pdf_layout_options, get_pdf_renderer
+
+# One page: a title plus 20 short chord/lyric lines.
+SAMPLE_SHEET = "\n".join(
+    "C   G/B   Am7   Fmaj7   Dm   E7" if i % 2 == 0 else "Singing along the highway while the night is falling"
+    for i in range(20)
+) + "\n"
+SAMPLE_TITLE = "Benchmark Sheet"
+
+
+def legacy_make_pdf(text: str, pdf_path, title: str, layout_overrides: dict | None = None):
+    """
+    make_pdf as it was before PdfRenderer: every call defines the canvas
+    class, re-reads the layout options and recompiles the page-marker regex.
+    Only change: pdf_path may also be a writable sink, so both variants can
+    render into memory.
+    """
+    try:
+        from reportlab.lib.pagesizes import LETTER
+        from reportlab.pdfgen import canvas
+    except ImportError as exc:
+        raise RuntimeError("PDF generation requires reportlab. Install dependencies from requirements.txt") from exc
+
+    class NumberedCanvas(canvas.Canvas):
+        """
+        Canvas that supports 'Page X of Y' by buffering pages
+        and writing the final total during save().
+        """
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._saved_page_states = []
+
+        def showPage(self):
+            self._saved_page_states.append(dict(self.__dict__))
+            self._startPage()
+
+        def save(self):
+            total_pages = len(self._saved_page_states)
+            for state in self._saved_page_states:
+                self.__dict__.update(state)
+                self._draw_page_number(total_pages)
+                super().showPage()
+            super().save()
+
+        def _draw_page_number(self, total_pages: int):
+            page_num = self.getPageNumber()
+            page_text = f"Page {page_num} of {total_pages}"
+            self.setFont("Helvetica", 9)
+
+            page_width, _ = self._pagesize
+            right_margin = 54
+            bottom_margin = 54
+            self.drawRightString(page_width - right_margin, bottom_margin - 18, page_text)
+
+    layout = get_pdf_layout_options(layout_overrides)
+
+    target = pdf_path if callable(getattr(pdf_path, "write", None)) else str(pdf_path)
+    c = NumberedCanvas(target, pagesize=LETTER)
+    width, height = LETTER
+
+    left_margin = layout["left_margin"]
+    top_margin = layout["top_margin"]
+    bottom_margin = layout["bottom_margin"]
+    content_x = left_margin + 10
+
+    title_font = "Helvetica-Bold"
+    title_size = layout["title_size"]
+    body_font = "Courier"
+    body_size = layout["body_size"]
+    line_height = layout["line_height"]
+
+    c.setTitle(title)
+    title_y = height - top_margin
+
+    page_marker_re = re.compile(r"^\s*Page\s+\d+\s*/\s*\d+\s*$", re.IGNORECASE)
+
+    def draw_header():
+        c.setFont(title_font, title_size)
+        c.drawCentredString(width / 2, title_y, title)
+        c.setFont(body_font, body_size)
+
+    def new_page():
+        nonlocal y
+        c.showPage()
+        draw_header()
+        y = title_y - (line_height * 2)
+
+    draw_header()
+    y = title_y - (line_height * 2)
+
+    max_width_chars = layout["max_width_chars"]
+    wrote_anything = False
+
+    for raw_line in text.splitlines():
+        if page_marker_re.match(raw_line):
+            new_page()
+            continue
+
+        line = raw_line
+        while True:
+            if y < bottom_margin:
+                new_page()
+
+            chunk = line[:max_width_chars]
+            remainder = line[max_width_chars:]
+
+            c.drawString(content_x, y, chunk)
+            wrote_anything = True
+            y -= line_height
+
+            if not remainder:
+                break
+            line = remainder
+
+    if wrote_anything:
+        c.showPage()
+
+    c.save()
+
+
+def _cached_make_pdf(text: str, pdf_path, title: str):
+    get_pdf_renderer().render(text, pdf_path, title)
+
+
+VARIANTS = (("per-call setup", legacy_make_pdf), ("cached renderer", _cached_make_pdf))
+
+
+def _mean_render_ms(render, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        render(SAMPLE_SHEET, BytesIO(), SAMPLE_TITLE)
+    return (time.perf_counter() - t0) * 1000.0 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-render PDF setup overhead for one-page sheets")
+    parser.add_argument("--rounds", type=int, default=21, help="Rounds; variant order alternates each round")
+    parser.add_argument("--iterations", type=int, default=50, help="Renders per variant per round")
+    args = parser.parse_args()
+
+    # Warm imports and the reportlab font cache so neither variant pays for them.
+    for _, render in VARIANTS:
+        render(SAMPLE_SHEET, BytesIO(), SAMPLE_TITLE)
+
+    means = {name: [] for name, _ in VARIANTS}
+    for round_no in range(args.rounds):
+        order = VARIANTS if round_no % 2 == 0 else VARIANTS[::-1]
+        for name, render in order:
+            means[name].append(_mean_render_ms(render, args.iterations))
+
+    for name, values in means.items():
+        print(f"{name:<16} median {statistics.median(values):7.3f} ms  min {min(values):7.3f} ms")
+
+    legacy = means["per-call setup"]
+    cached = means["cached renderer"]
+    diffs = [old - new for old, new in zip(legacy, cached)]
+    median_diff = statistics.median(diffs)
+    print(
+        f"setup overhead per render: median {median_diff:.3f} ms "
+        f"({median_diff / statistics.median(legacy) * 100:.1f}%), "
+        f"min-vs-min {min(legacy) - min(cached):.3f} ms, "
+        f"cached faster in {sum(d > 0 for d in diffs)}/{len(diffs)} rounds"
+    )
+
+
+if __name__ == "__main__":
+    main()
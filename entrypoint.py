@@ -1,6 +1,7 @@
 ﻿import os
 import sys
 import argparse
+from io import BytesIO
 from datetime import datetime
 
 from transpose_chords import transpose_text
@@ -30,6 +31,7 @@ def main():
     parser.add_argument("--semitones", type=int, help="Transpose by semitones (0-11; overrides capo)")
     parser.add_argument("--title", default="Chord Sheet", help="Title for file/PDF")
     parser.add_argument("--pdf", action="store_true", help="Also generate PDF")
+    parser.add_argument("--pdf-stdout", action="store_true", help="Write the PDF to stdout instead of the transposed text")
     parser.add_argument("--no-save", action="store_true", help="Do not save output")
     parser.add_argument(
         "--conflict",
@@ -80,7 +82,19 @@ def main():
         raise SystemExit("No input received.")
 
     result = transpose_text(raw, semitones)
-    sys.stdout.write(result)
+
+    if args.pdf_stdout:
+        # Render straight into the pipe unless the same PDF is also being archived.
+        pdf_buf = BytesIO() if args.pdf and not args.no_save else None
+        if pdf_buf is not None:
+            make_pdf(result, pdf_buf, title=args.title)
+            sys.stdout.buffer.write(pdf_buf.getbuffer())
+        else:
+            make_pdf(result, sys.stdout.buffer, title=args.title)
+        sys.stdout.buffer.flush()
+    else:
+        pdf_buf = None
+        sys.stdout.write(result)
 
     if args.no_save:
         return
@@ -97,7 +111,10 @@ def main():
 
     if args.pdf:
         pdf_path = outdir / f"{final_stem}.pdf"
-        make_pdf(result, pdf_path, title=args.title)
+        if pdf_buf is not None:
+            pdf_path.write_bytes(pdf_buf.getbuffer())
+        else:
+            make_pdf(result, pdf_path, title=args.title)
 
 
 if __name__ == "__main__":
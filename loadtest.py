@@ -0,0 +1,552 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import uuid
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+REPO_ROOT = Path(__file__).resolve().parent
+
+ROUTES = ("generate", "generate_pdf", "render_pdf", "upload", "outputs", "view", "download", "delete_group")
+DEFAULT_MIX = "generate=3,generate_pdf=2,outputs=2,view=3,download=3,delete_group=1"
+
+# Status codes each operation returns on success. Anything else counts as an error.
+EXPECTED_STATUS = {
+    "generate": {200},
+    "generate_pdf": {200},
+    "render_pdf": {200},
+    "upload": {200},
+    "outputs": {200},
+    "view": {200},
+    "download": {200},
+    "delete_group": {302},
+}
+
+SAMPLE_PROGRESSION = ["C", "G/B", "Am7", "Fmaj7", "Dm", "Esus4", "E7", "Bb", "F#m7b5", "Cadd9"]
+
+
+def parse_mix(spec: str) -> dict:
+    """
+    Parse a route mix such as "generate=3,outputs=1" into {route: weight}.
+    """
+    mix = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise SystemExit(f"Unknown route in mix: {name}. Choose from: {', '.join(ROUTES)}")
+        try:
+            value = float(weight) if weight else 1.0
+        except ValueError:
+            raise SystemExit(f"Invalid weight for {name}: {weight}")
+        if value < 0:
+            raise SystemExit(f"Weight for {name} must not be negative.")
+        if value > 0:
+            mix[name] = value
+    if not mix:
+        raise SystemExit("Route mix is empty.")
+    return mix
+
+
+def synthetic_sheet(lines: int, seed: int) -> str:
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        if i % 2 == 0:
+            out.append("   ".join(rng.choice(SAMPLE_PROGRESSION) for _ in range(6)))
+        else:
+            out.append("Singing along the highway while the night is falling down")
+    return "\n".join(out) + "\n"
+
+
+def seed_archive(outdir: Path, groups: int, file_kb: int) -> list[str]:
+    """
+    Write `groups` txt+pdf pairs into outdir and return the file names.
+    """
+    outdir.mkdir(parents=True, exist_ok=True)
+    filler = b"%" + b"x" * 63 + b"\n"
+    pdf_body = b"%PDF-1.4\n" + filler * max(0, file_kb * 16) + b"%%EOF\n"
+    txt_body = synthetic_sheet(max(2, file_kb * 16), seed=0)
+
+    names = []
+    for i in range(groups):
+        stem = f"loadtest-song-{i:05d}-capo{i % 12}"
+        (outdir / f"{stem}.txt").write_text(txt_body, encoding="utf-8")
+        (outdir / f"{stem}.pdf").write_bytes(pdf_body)
+        names.extend([f"{stem}.txt", f"{stem}.pdf"])
+    return names
+
+
+def read_rss_kb(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def encode_multipart(form: dict) -> tuple[bytes, str]:
+    """
+    Encode a form as multipart/form-data. (filename, bytes) values become file parts.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in form.items():
+        if isinstance(value, tuple):
+            filename, data = value
+            head = (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                "Content-Type: text/plain\r\n\r\n"
+            )
+            parts.append(head.encode() + data + b"\r\n")
+        else:
+            head = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            parts.append(head.encode() + str(value).encode() + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class TestClientTarget:
+    """
+    Drive create_app() in-process through Flask's test client.
+    """
+
+    name = "test-client"
+    # RSS of this process: the app plus the harness and its samples.
+    rss_scope = "process RSS (in-process)"
+
+    def __init__(self):
+        from webui import create_app
+
+        self.app = create_app({"TESTING": True})
+        self.pid = os.getpid()
+
+    def new_client(self):
+        client = self.app.test_client()
+
+        def send(method: str, path: str, form: dict | None = None) -> int:
+            if form:
+                form = {k: (BytesIO(v[1]), v[0]) if isinstance(v, tuple) else v for k, v in form.items()}
+            try:
+                resp = client.open(path, method=method, data=form)
+            except Exception:
+                # TESTING propagates view errors; count them like a server would.
+                return 500
+            try:
+                _ = resp.data
+                return resp.status_code
+            finally:
+                resp.close()
+
+        return send
+
+    def close(self):
+        pass
+
+
+class ServerTarget:
+    """
+    Start webui.py as a local server process and drive it over HTTP.
+    """
+
+    name = "server"
+    rss_scope = "server RSS"
+
+    def __init__(self, env: dict, startup_timeout_s: float = 15.0):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.host = "127.0.0.1"
+
+        child_env = dict(env)
+        child_env["WEB_HOST"] = self.host
+        child_env["WEB_PORT"] = str(self.port)
+        self.proc = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "webui.py")],
+            env=child_env,
+            cwd=str(REPO_ROOT),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.pid = self.proc.pid
+
+        if not self._wait_for_server(startup_timeout_s):
+            self.close()
+            raise SystemExit("Could not start local web server for load test.")
+
+    def _wait_for_server(self, timeout_s: float) -> bool:
+        deadline = time.time() + timeout_s
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                return False
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(0.5)
+                if sock.connect_ex((self.host, self.port)) == 0:
+                    return True
+            time.sleep(0.1)
+        return False
+
+    def new_client(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+        def send(method: str, path: str, form: dict | None = None) -> int:
+            body = None
+            headers = {}
+            if form is not None and any(isinstance(v, tuple) for v in form.values()):
+                body, headers["Content-Type"] = encode_multipart(form)
+            elif form is not None:
+                body = urlencode(form)
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                return resp.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                return 0
+
+        return send
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+class LoadRun:
+    def __init__(self, target, outdir: Path, files: list[str], mix: dict, args):
+        self.target = target
+        self.outdir = outdir
+        self.files = files
+        self.routes = list(mix.keys())
+        self.weights = list(mix.values())
+        self.args = args
+        self.sheet = synthetic_sheet(args.sheet_lines, seed=args.seed)
+        self.upload_body = synthetic_sheet(args.upload_lines, seed=args.seed).encode("utf-8")
+
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._deadline = None
+        self._delete_seq = 0
+        self.samples = []
+        self.rss_samples = []
+
+    def _next_slot(self) -> bool:
+        with self._lock:
+            if self._deadline is not None:
+                return time.perf_counter() < self._deadline
+            if self._issued >= self.args.requests:
+                return False
+            self._issued += 1
+            return True
+
+    def _prepare_delete_group(self, worker_id: int) -> str:
+        with self._lock:
+            self._delete_seq += 1
+            seq = self._delete_seq
+        stem = f"loadtest-delete-{worker_id}-{seq}-capo0"
+        (self.outdir / f"{stem}.txt").write_text("C G Am F\n", encoding="utf-8")
+        return stem
+
+    def _request_for(self, route: str, rng: random.Random, worker_id: int):
+        if route in ("generate", "generate_pdf"):
+            form = {
+                "title": f"Load Test {rng.randrange(1000)}",
+                "capo": str(rng.randrange(12)),
+                "text": self.sheet,
+                "pdf": "1" if route == "generate_pdf" else "0",
+            }
+            return "POST", "/generate", form
+        if route == "render_pdf":
+            form = {"title": f"Load Test {rng.randrange(1000)}", "capo": str(rng.randrange(12)), "text": self.sheet}
+            return "POST", "/render.pdf", form
+        if route == "upload":
+            form = {"capo": str(rng.randrange(12)), "pdf": "0", "files": (f"upload-{worker_id}.txt", self.upload_body)}
+            return "POST", "/generate", form
+        if route == "outputs":
+            return "GET", "/outputs", None
+        if route in ("view", "download"):
+            name = quote(rng.choice(self.files)) if self.files else "missing.txt"
+            return "GET", f"/{route}/{name}", None
+        return "POST", "/delete-group", {"group_key": self._prepare_delete_group(worker_id)}
+
+    def _worker(self, worker_id: int, started: float):
+        rng = random.Random(self.args.seed * 1_000 + worker_id)
+        send = self.target.new_client()
+        local = []
+
+        while self._next_slot():
+            route = rng.choices(self.routes, weights=self.weights)[0]
+            method, path, form = self._request_for(route, rng, worker_id)
+
+            t0 = time.perf_counter()
+            status = send(method, path, form)
+            t1 = time.perf_counter()
+
+            local.append(
+                {
+                    "route": route,
+                    "at_s": t0 - started,
+                    "latency_ms": (t1 - t0) * 1000.0,
+                    "status": status,
+                    "ok": status in EXPECTED_STATUS[route],
+                }
+            )
+
+        with self._lock:
+            self.samples.extend(local)
+
+    def _sample_rss(self, stop: threading.Event, started: float):
+        while True:
+            rss = read_rss_kb(self.target.pid)
+            if rss is not None:
+                self.rss_samples.append({"at_s": round(time.perf_counter() - started, 3), "rss_kb": rss})
+            if stop.wait(self.args.rss_interval):
+                break
+
+    def warmup(self):
+        send = self.target.new_client()
+        rng = random.Random(self.args.seed)
+        for route in self.routes:
+            for _ in range(self.args.warmup):
+                send(*self._request_for(route, rng, worker_id=0))
+
+    def run(self) -> float:
+        started = time.perf_counter()
+        if self.args.duration:
+            self._deadline = started + self.args.duration
+
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample_rss, args=(stop, started), daemon=True)
+        sampler.start()
+
+        workers = [
+            threading.Thread(target=self._worker, args=(i, started), daemon=True)
+            for i in range(self.args.concurrency)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        elapsed = time.perf_counter() - started
+        stop.set()
+        sampler.join()
+        return elapsed
+
+
+def summarize(samples: list[dict], elapsed_s: float) -> dict:
+    by_route = {}
+    for s in samples:
+        by_route.setdefault(s["route"], []).append(s)
+
+    def stats(items: list[dict]) -> dict:
+        latencies = sorted(s["latency_ms"] for s in items)
+        errors = sum(1 for s in items if not s["ok"])
+        return {
+            "count": len(items),
+            "errors": errors,
+            "error_rate": errors / len(items) if items else 0.0,
+            "throughput_rps": len(items) / elapsed_s if elapsed_s > 0 else 0.0,
+            "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": latencies[-1] if latencies else 0.0,
+        }
+
+    routes = {route: stats(items) for route, items in sorted(by_route.items())}
+    return {"overall": stats(samples), "routes": routes}
+
+
+def build_report(run: LoadRun, elapsed_s: float, mix: dict, archive_files: int) -> dict:
+    rss_values = [s["rss_kb"] for s in run.rss_samples]
+    return {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "label": run.args.label or run.target.name,
+        "config": {
+            "target": run.target.name,
+            "concurrency": run.args.concurrency,
+            "requests": None if run.args.duration else run.args.requests,
+            "duration_s": run.args.duration,
+            "mix": mix,
+            "archive_files": archive_files,
+            "sheet_lines": run.args.sheet_lines,
+            "upload_lines": run.args.upload_lines,
+            "seed": run.args.seed,
+        },
+        "elapsed_s": elapsed_s,
+        "summary": summarize(run.samples, elapsed_s),
+        "rss": {
+            "pid": run.target.pid,
+            "scope": run.target.rss_scope,
+            "start_kb": rss_values[0] if rss_values else None,
+            "peak_kb": max(rss_values) if rss_values else None,
+            "end_kb": rss_values[-1] if rss_values else None,
+            "samples": run.rss_samples,
+        },
+    }
+
+
+def _fmt_kb(value) -> str:
+    return "n/a" if value is None else f"{value / 1024:.1f} MB"
+
+
+def print_report(report: dict):
+    cfg = report["config"]
+    print(
+        f"{report['label']}: {cfg['target']}, concurrency {cfg['concurrency']}, "
+        f"{cfg['archive_files']} archive files, {report['elapsed_s']:.2f}s"
+    )
+    header = f"{'route':<14}{'count':>7}{'err%':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["summary"]["routes"].items()) + [("overall", report["summary"]["overall"])]
+    for route, s in rows:
+        print(
+            f"{route:<14}{s['count']:>7}{s['error_rate'] * 100:>7.1f}{s['throughput_rps']:>9.1f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}"
+        )
+    rss = report["rss"]
+    print(f"{rss.get('scope', 'server RSS')}: start {_fmt_kb(rss['start_kb'])}, peak {_fmt_kb(rss['peak_kb'])}, end {_fmt_kb(rss['end_kb'])}")
+
+
+def _pct_change(old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare_reports(baseline: dict, candidate: dict):
+    print(f"baseline: {baseline['label']} ({baseline['created']})")
+    print(f"candidate: {candidate['label']} ({candidate['created']})")
+    metrics = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate")
+
+    base_routes = dict(baseline["summary"]["routes"], overall=baseline["summary"]["overall"])
+    cand_routes = dict(candidate["summary"]["routes"], overall=candidate["summary"]["overall"])
+    ordered = sorted(set(base_routes) | set(cand_routes), key=lambda r: (r == "overall", r))
+
+    header = f"{'route':<14}{'metric':<16}{'baseline':>12}{'candidate':>12}{'change':>10}"
+    print(header)
+    print("-" * len(header))
+    for route in ordered:
+        old = base_routes.get(route)
+        new = cand_routes.get(route)
+        if old is None or new is None:
+            print(f"{route:<14}{'(only in ' + ('candidate' if old is None else 'baseline') + ')':<16}")
+            continue
+        for metric in metrics:
+            print(
+                f"{route:<14}{metric:<16}{old[metric]:>12.2f}{new[metric]:>12.2f}"
+                f"{_pct_change(old[metric], new[metric]):>10}"
+            )
+
+    old_peak = baseline["rss"]["peak_kb"]
+    new_peak = candidate["rss"]["peak_kb"]
+    change = _pct_change(old_peak, new_peak) if old_peak and new_peak else "n/a"
+    print(f"{'rss':<14}{'peak':<16}{_fmt_kb(old_peak):>12}{_fmt_kb(new_peak):>12}{change:>10}")
+
+
+def _load_report(path: str) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Could not read report {path}: {exc}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CapoToKeys offline load test")
+    parser.add_argument("--server", action="store_true", help="Start webui.py as a local server instead of using the test client")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted route mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests to send")
+    parser.add_argument("--duration", type=float, help="Run for N seconds instead of a fixed request count")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed warmup requests per route")
+    parser.add_argument("--archive-groups", type=int, default=200, help="Synthetic txt+pdf groups to seed the archive with")
+    parser.add_argument("--archive-file-kb", type=int, default=4, help="Approximate size of each seeded file")
+    parser.add_argument("--sheet-lines", type=int, default=60, help="Lines in the synthetic chord sheet posted to /generate")
+    parser.add_argument("--upload-lines", type=int, default=2000, help="Lines in the synthetic file sent by the upload route")
+    parser.add_argument("--rss-interval", type=float, default=0.25, help="Seconds between RSS samples")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the request schedule")
+    parser.add_argument("--data-dir", help="DATA_DIR to use (default: a temporary directory)")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the temporary DATA_DIR after the run")
+    parser.add_argument("--label", help="Label stored in the report")
+    parser.add_argument("--json", dest="json_path", help="Write the full report to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two JSON reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(_load_report(args.compare[0]), _load_report(args.compare[1]))
+        return
+
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1.")
+    if args.duration is None and args.requests < 1:
+        raise SystemExit("--requests must be at least 1.")
+
+    mix = parse_mix(args.mix)
+
+    temp_dir = None
+    if args.data_dir:
+        data_dir = Path(args.data_dir)
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="capotokeys-load-")
+        data_dir = Path(temp_dir)
+    os.environ["DATA_DIR"] = str(data_dir)
+
+    outdir = data_dir / "outputs"
+    files = seed_archive(outdir, args.archive_groups, args.archive_file_kb)
+
+    target = None
+    try:
+        target = ServerTarget(dict(os.environ)) if args.server else TestClientTarget()
+        run = LoadRun(target, outdir, files, mix, args)
+        if args.warmup > 0:
+            run.warmup()
+        elapsed = run.run()
+        report = build_report(run, elapsed, mix, len(files))
+    finally:
+        if target is not None:
+            target.close()
+        if temp_dir and not args.keep_data:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from loadtest import compare_reports, parse_mix, percentile
+
+
+def _report(label: str, p50: float, rps: float, peak_kb: int | None) -> dict:
+    stats = {
+        "count": 10,
+        "errors": 0,
+        "error_rate": 0.0,
+        "throughput_rps": rps,
+        "mean_ms": p50,
+        "p50_ms": p50,
+        "p95_ms": p50 * 2,
+        "p99_ms": p50 * 3,
+        "max_ms": p50 * 4,
+    }
+    return {
+        "label": label,
+        "created": "2026-01-01 00:00:00",
+        "summary": {"overall": stats, "routes": {"outputs": stats}},
+        "rss": {"peak_kb": peak_kb},
+    }
+
+
+class ParseMixTests(unittest.TestCase):
+    def test_parses_weights(self):
+        self.assertEqual(parse_mix("generate=3, outputs=1.5"), {"generate": 3.0, "outputs": 1.5})
+
+    def test_missing_weight_defaults_to_one(self):
+        self.assertEqual(parse_mix("view"), {"view": 1.0})
+
+    def test_zero_weight_is_dropped(self):
+        self.assertEqual(parse_mix("view=0,download=2"), {"download": 2.0})
+
+    def test_rejects_unknown_route(self):
+        with self.assertRaises(SystemExit):
+            parse_mix("nope=1")
+
+    def test_rejects_bad_weight(self):
+        with self.assertRaises(SystemExit):
+            parse_mix("view=abc")
+        with self.assertRaises(SystemExit):
+            parse_mix("view=-1")
+
+    def test_rejects_empty_mix(self):
+        with self.assertRaises(SystemExit):
+            parse_mix("view=0")
+
+
+class PercentileTests(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 95), 95.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile(values, 100), 100.0)
+
+    def test_small_and_empty_lists(self):
+        self.assertEqual(percentile([7.0], 99), 7.0)
+        self.assertEqual(percentile([1.0, 2.0], 50), 1.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+class CompareReportsTests(unittest.TestCase):
+    def test_prints_relative_change(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            compare_reports(_report("before", 10.0, 100.0, 1024), _report("after", 5.0, 150.0, 2048))
+        text = out.getvalue()
+
+        self.assertIn("baseline: before", text)
+        self.assertIn("candidate: after", text)
+        self.assertRegex(text, r"outputs\s+p50_ms\s+10\.00\s+5\.00\s+-50\.0%")
+        self.assertRegex(text, r"overall\s+throughput_rps\s+100\.00\s+150\.00\s+\+50\.0%")
+        self.assertRegex(text, r"rss\s+peak\s+1\.0 MB\s+2\.0 MB\s+\+100\.0%")
+
+    def test_route_missing_from_one_report(self):
+        candidate = _report("after", 5.0, 150.0, None)
+        candidate["summary"]["routes"]["view"] = candidate["summary"]["routes"]["outputs"]
+        out = io.StringIO()
+        with redirect_stdout(out):
+            compare_reports(_report("before", 10.0, 100.0, None), candidate)
+        text = out.getvalue()
+
+        self.assertRegex(text, r"view\s+\(only in candidate\)")
+        self.assertRegex(text, r"rss\s+peak\s+n/a\s+n/a\s+n/a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from webui import _collect_output_groups
+
+
+class CollectOutputGroupsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.outdir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_groups_txt_and_pdf(self):
+        (self.outdir / "song-capo2.txt").write_text("D\n", encoding="utf-8")
+        (self.outdir / "song-capo2.pdf").write_bytes(b"%PDF")
+
+        groups = _collect_output_groups(self.outdir, 100)
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual([f["ext"] for f in groups[0]["files"]], ["pdf", "txt"])
+
+    def test_skips_files_deleted_during_listing(self):
+        kept = self.outdir / "kept-capo1.txt"
+        gone = self.outdir / "gone-capo1.txt"
+        kept.write_text("C\n", encoding="utf-8")
+        gone.write_text("C\n", encoding="utf-8")
+
+        real_glob = Path.glob
+
+        def glob_then_delete(path, pattern):
+            found = list(real_glob(path, pattern))
+            os.unlink(gone)
+            return iter(found)
+
+        with mock.patch.object(Path, "glob", glob_then_delete):
+            groups = _collect_output_groups(self.outdir, 100)
+
+        self.assertEqual([g["key"] for g in groups], ["kept-capo1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
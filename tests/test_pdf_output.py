@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+from utils import make_pdf
+from webui import create_app
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class MakePdfSinkTests(unittest.TestCase):
+    def test_renders_into_bytesio(self):
+        buf = BytesIO()
+        make_pdf("C G Am F\nla la la\n", buf, title="Song")
+
+        data = buf.getvalue()
+        self.assertTrue(data.startswith(b"%PDF-"))
+        self.assertIn(b"%%EOF", data[-32:])
+        self.assertFalse(buf.closed)
+
+
+class RenderPdfRouteTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"DATA_DIR": self._tmp.name})
+        self._env.start()
+        self.outdir = Path(self._tmp.name) / "outputs"
+        self.client = create_app({"TESTING": True}).test_client()
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def _outputs(self):
+        return sorted(p.name for p in self.outdir.glob("*")) if self.outdir.exists() else []
+
+    def test_streams_pdf_without_writing_outputs(self):
+        resp = self.client.post("/render.pdf", data={"text": "C G\n", "capo": "2", "title": "Song"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, "application/pdf")
+        self.assertTrue(resp.data.startswith(b"%PDF-"))
+        self.assertEqual(self._outputs(), [])
+
+    def test_archive_saves_same_bytes_as_response(self):
+        resp = self.client.post("/render.pdf", data={"text": "C G\n", "capo": "2", "title": "Song", "archive": "1"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._outputs(), ["song-capo2.pdf", "song-capo2.txt"])
+        self.assertEqual((self.outdir / "song-capo2.pdf").read_bytes(), resp.data)
+        self.assertEqual((self.outdir / "song-capo2.txt").read_text(encoding="utf-8"), "D A\n")
+
+    def test_archive_conflict_flashes_suffixed_name(self):
+        form = {"text": "C G\n", "capo": "2", "title": "Song", "archive": "1"}
+        self.client.post("/render.pdf", data=form)
+        resp = self.client.post("/render.pdf", data=form)
+
+        self.assertIn("song-capo2-2.pdf", resp.headers["Content-Disposition"])
+        with self.client.session_transaction() as session:
+            flashes = [m for _, m in session.get("_flashes", [])]
+        self.assertIn("Existing file detected. Saved as song-capo2-2.*", flashes)
+
+    def test_invalid_form_redirects(self):
+        resp = self.client.post("/render.pdf", data={"text": "", "capo": "2"})
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(self._outputs(), [])
+
+
+class PdfStdoutCliTests(unittest.TestCase):
+    def test_pdf_stdout_no_save_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, DATA_DIR=data_dir)
+            proc = subprocess.run(
+                [sys.executable, str(REPO_ROOT / "entrypoint.py"), "--capo", "2", "--pdf-stdout", "--no-save"],
+                input=b"C G\nla la\n",
+                capture_output=True,
+                env=env,
+                check=True,
+            )
+
+            self.assertTrue(proc.stdout.startswith(b"%PDF-"))
+            self.assertEqual(list((Path(data_dir) / "outputs").glob("*")), [])
+
+    def test_pdf_stdout_with_archive_matches_saved_pdf(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, DATA_DIR=data_dir)
+            proc = subprocess.run(
+                [sys.executable, str(REPO_ROOT / "entrypoint.py"), "--capo", "2", "--pdf-stdout", "--pdf"],
+                input=b"C G\nla la\n",
+                capture_output=True,
+                env=env,
+                check=True,
+            )
+
+            saved = Path(data_dir) / "outputs" / "chord-sheet-capo2.pdf"
+            self.assertEqual(saved.read_bytes(), proc.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
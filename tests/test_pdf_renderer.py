@@ -0,0 +1,213 @@
+import os
+import re
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from reportlab import rl_config
+
+import utils
+from utils import get_pdf_layout_options, get_pdf_renderer, make_pdf
+
+
+def _legacy_make_pdf(text: str, pdf_path, title: str, layout_overrides: dict | None = None):
+    """
+    Reference copy of make_pdf from before PdfRenderer, kept here so the
+    byte-identity check does not depend on the current implementation.
+    Only change: pdf_path may also be a writable sink.
+    """
+    try:
+        from reportlab.lib.pagesizes import LETTER
+        from reportlab.pdfgen import canvas
+    except ImportError as exc:
+        raise RuntimeError("PDF generation requires reportlab. Install dependencies from requirements.txt") from exc
+
+    class NumberedCanvas(canvas.Canvas):
+        """
+        Canvas that supports 'Page X of Y' by buffering pages
+        and writing the final total during save().
+        """
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._saved_page_states = []
+
+        def showPage(self):
+            self._saved_page_states.append(dict(self.__dict__))
+            self._startPage()
+
+        def save(self):
+            total_pages = len(self._saved_page_states)
+            for state in self._saved_page_states:
+                self.__dict__.update(state)
+                self._draw_page_number(total_pages)
+                super().showPage()
+            super().save()
+
+        def _draw_page_number(self, total_pages: int):
+            page_num = self.getPageNumber()
+            page_text = f"Page {page_num} of {total_pages}"
+            self.setFont("Helvetica", 9)
+
+            page_width, _ = self._pagesize
+            right_margin = 54
+            bottom_margin = 54
+            self.drawRightString(page_width - right_margin, bottom_margin - 18, page_text)
+
+    layout = get_pdf_layout_options(layout_overrides)
+
+    target = pdf_path if callable(getattr(pdf_path, "write", None)) else str(pdf_path)
+    c = NumberedCanvas(target, pagesize=LETTER)
+    width, height = LETTER
+
+    left_margin = layout["left_margin"]
+    top_margin = layout["top_margin"]
+    bottom_margin = layout["bottom_margin"]
+    content_x = left_margin + 10
+
+    title_font = "Helvetica-Bold"
+    title_size = layout["title_size"]
+    body_font = "Courier"
+    body_size = layout["body_size"]
+    line_height = layout["line_height"]
+
+    c.setTitle(title)
+    title_y = height - top_margin
+
+    page_marker_re = re.compile(r"^\s*Page\s+\d+\s*/\s*\d+\s*$", re.IGNORECASE)
+
+    def draw_header():
+        c.setFont(title_font, title_size)
+        c.drawCentredString(width / 2, title_y, title)
+        c.setFont(body_font, body_size)
+
+    def new_page():
+        nonlocal y
+        c.showPage()
+        draw_header()
+        y = title_y - (line_height * 2)
+
+    draw_header()
+    y = title_y - (line_height * 2)
+
+    max_width_chars = layout["max_width_chars"]
+    wrote_anything = False
+
+    for raw_line in text.splitlines():
+        if page_marker_re.match(raw_line):
+            new_page()
+            continue
+
+        line = raw_line
+        while True:
+            if y < bottom_margin:
+                new_page()
+
+            chunk = line[:max_width_chars]
+            remainder = line[max_width_chars:]
+
+            c.drawString(content_x, y, chunk)
+            wrote_anything = True
+            y -= line_height
+
+            if not remainder:
+                break
+            line = remainder
+
+    if wrote_anything:
+        c.showPage()
+
+    c.save()
+
+
+class PdfRendererCacheTests(unittest.TestCase):
+    def setUp(self):
+        utils._pdf_renderer_cache.clear()
+        # Start every test from the default layout regardless of the caller's env.
+        self._env = mock.patch.dict(os.environ)
+        self._env.start()
+        for _, env_name, _, _, _ in utils.PDF_LAYOUT_SETTINGS:
+            os.environ.pop(env_name, None)
+
+    def tearDown(self):
+        self._env.stop()
+        utils._pdf_renderer_cache.clear()
+
+    def test_reuses_renderer_for_same_layout(self):
+        self.assertIs(get_pdf_renderer(), get_pdf_renderer())
+        self.assertIs(get_pdf_renderer({"PDF_BODY_SIZE": 12}), get_pdf_renderer({"PDF_BODY_SIZE": 12}))
+
+    def test_env_change_builds_new_renderer(self):
+        first = get_pdf_renderer()
+        os.environ["PDF_BODY_SIZE"] = "14"
+        second = get_pdf_renderer()
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first.layout["body_size"], 10)
+        self.assertEqual(second.layout["body_size"], 14)
+
+    def test_override_change_builds_new_renderer(self):
+        first = get_pdf_renderer({"PDF_LINE_HEIGHT": 14})
+        second = get_pdf_renderer({"PDF_LINE_HEIGHT": 16})
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.layout["line_height"], 16)
+
+    def test_key_follows_parsed_layout(self):
+        # 12.7 parses to 12; "12.7" is invalid and falls back to the default 10.
+        numeric = get_pdf_renderer({"PDF_BODY_SIZE": 12.7})
+        text = get_pdf_renderer({"PDF_BODY_SIZE": "12.7"})
+
+        self.assertEqual(numeric.layout["body_size"], 12)
+        self.assertEqual(text.layout["body_size"], 10)
+        self.assertIs(text, get_pdf_renderer())
+
+    def test_equivalent_inputs_share_renderer(self):
+        os.environ["PDF_BODY_SIZE"] = "12"
+        self.assertIs(get_pdf_renderer(), get_pdf_renderer({"PDF_BODY_SIZE": 12}))
+
+    def test_cache_clears_past_limit(self):
+        limit = utils._PDF_RENDERER_CACHE_LIMIT
+        for size in range(limit):
+            get_pdf_renderer({"PDF_BODY_SIZE": 6 + size})
+        self.assertEqual(len(utils._pdf_renderer_cache), limit)
+
+        newest = get_pdf_renderer({"PDF_BODY_SIZE": 6 + limit})
+
+        self.assertEqual(len(utils._pdf_renderer_cache), 1)
+        self.assertIs(get_pdf_renderer({"PDF_BODY_SIZE": 6 + limit}), newest)
+
+    def test_layout_is_read_only(self):
+        renderer = get_pdf_renderer()
+        with self.assertRaises(TypeError):
+            renderer.layout["body_size"] = 20
+
+
+class PdfOutputCompatibilityTests(unittest.TestCase):
+    def setUp(self):
+        self._invariant = rl_config.invariant
+        rl_config.invariant = 1
+        utils._pdf_renderer_cache.clear()
+
+    def tearDown(self):
+        rl_config.invariant = self._invariant
+        utils._pdf_renderer_cache.clear()
+
+    def test_output_matches_previous_make_pdf(self):
+        texts = [
+            "C G Am F\nla la la\n" * 3,
+            ("x" * 300 + "\n") * 120 + "Page 2/3\nC G\n",
+            "",
+        ]
+        for overrides in (None, {"PDF_BODY_SIZE": 14, "PDF_LINE_HEIGHT": 20, "PDF_MAX_WIDTH_CHARS": 60}):
+            for text in texts:
+                with self.subTest(overrides=overrides, lines=text.count("\n")):
+                    expected = BytesIO()
+                    actual = BytesIO()
+                    _legacy_make_pdf(text, expected, "Song", overrides)
+                    make_pdf(text, actual, "Song", overrides)
+                    self.assertEqual(actual.getvalue(), expected.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
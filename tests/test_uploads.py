@@ -0,0 +1,233 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from flask.testing import EnvironBuilder
+
+from webui import UPLOAD_CHUNK_BYTES, _transpose_upload, create_app
+
+
+class TransposeUploadTests(unittest.TestCase):
+    def _run(self, data: bytes, semitones: int = 2, max_chars: int = 10_000_000):
+        sink = StringIO()
+        has_content, err = _transpose_upload(BytesIO(data), sink, semitones, max_chars)
+        return sink.getvalue(), has_content, err
+
+    def test_chord_across_chunk_boundary(self):
+        # "Am7" starts two bytes before the end of the first chunk.
+        prefix = "la la\n" + " " * (UPLOAD_CHUNK_BYTES - 6 - 2)
+        text = prefix + "Am7 G\nend\n"
+        self.assertEqual(len(prefix.encode()), UPLOAD_CHUNK_BYTES - 2)
+
+        out, has_content, err = self._run(text.encode("utf-8"))
+
+        self.assertIsNone(err)
+        self.assertTrue(has_content)
+        self.assertEqual(out, prefix + "Bm7 A\nend\n")
+
+    def test_multibyte_character_across_chunk_boundary(self):
+        # The two-byte "é" starts on the last byte of the first chunk.
+        prefix = "C\n" + "x" * (UPLOAD_CHUNK_BYTES - 2 - 1)
+        text = prefix + "é G\n"
+
+        out, _, err = self._run(text.encode("utf-8"))
+
+        self.assertIsNone(err)
+        self.assertNotIn("�", out)
+        self.assertEqual(out, "D\n" + "x" * (UPLOAD_CHUNK_BYTES - 3) + "é A\n")
+
+    def test_file_without_newline(self):
+        out, has_content, err = self._run(b"C G Am")
+
+        self.assertIsNone(err)
+        self.assertTrue(has_content)
+        self.assertEqual(out, "D A Bm")
+
+    def test_strips_utf8_bom(self):
+        out, _, _ = self._run(b"\xef\xbb\xbfC\n")
+        self.assertEqual(out, "D\n")
+
+    def test_stops_at_limit(self):
+        _, _, err = self._run(b"C\n" * 1000, max_chars=1000)
+        self.assertIn("1000 characters", err)
+
+    def test_whitespace_only_has_no_content(self):
+        out, has_content, err = self._run(b"  \n\n")
+        self.assertIsNone(err)
+        self.assertFalse(has_content)
+
+
+class UploadRouteTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"DATA_DIR": self._tmp.name})
+        self._env.start()
+        self.outdir = Path(self._tmp.name) / "outputs"
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def _client(self, **config):
+        return create_app({"TESTING": True, **config}).test_client()
+
+    def _post(self, client, files, **form):
+        data = {"capo": "2", "pdf": "0", **form, "files": [(BytesIO(body), name) for name, body in files]}
+        return client.post("/generate", data=data, content_type="multipart/form-data")
+
+    def _outputs(self):
+        return sorted(p.name for p in self.outdir.glob("*")) if self.outdir.exists() else []
+
+    def _flashes(self, client):
+        with client.session_transaction() as session:
+            return [m for _, m in session.get("_flashes", [])]
+
+    def test_transposes_several_files(self):
+        client = self._client()
+        resp = self._post(client, [("one.txt", b"C G\n"), ("Two Song.pro", b"Am\n")])
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._outputs(), ["one-capo2.txt", "two-song-capo2.txt"])
+        self.assertEqual((self.outdir / "two-song-capo2.txt").read_text(encoding="utf-8"), "Bm\n")
+
+    def test_single_file_uses_title_and_pdf(self):
+        client = self._client()
+        self._post(client, [("a.txt", b"C\n")], title="My Song", pdf="1")
+
+        self.assertEqual(self._outputs(), ["my-song-capo2.pdf", "my-song-capo2.txt"])
+
+    def test_title_with_several_files_is_reported(self):
+        client = self._client()
+        resp = self._post(client, [("one.txt", b"C\n"), ("two.txt", b"G\n")], title="Ignored")
+
+        self.assertEqual(self._outputs(), ["one-capo2.txt", "two-capo2.txt"])
+        self.assertIn(b"Song name is only used for a single upload", resp.data)
+
+    def test_text_limit_removes_partial_txt(self):
+        client = self._client(MAX_TEXT_LENGTH=1_000)
+        resp = self._post(client, [("long.txt", b"C\n" * (UPLOAD_CHUNK_BYTES // 2 + 1000))])
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(self._outputs(), [])
+        self.assertEqual(self._flashes(client), ["long.txt: exceeds the maximum of 1000 characters."])
+
+    def test_rejected_upload_keeps_archived_file_in_overwrite_mode(self):
+        client = self._client(MAX_TEXT_LENGTH=1_000)
+        with mock.patch.dict(os.environ, {"OUTPUT_CONFLICT_MODE": "overwrite"}):
+            client.post("/generate", data={"capo": "2", "title": "Song", "text": "C G\n"})
+            self.assertEqual(self._outputs(), ["song-capo2.pdf", "song-capo2.txt"])
+
+            resp = self._post(client, [("big.txt", b"C\n" * 1000)], title="Song")
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(self._outputs(), ["song-capo2.pdf", "song-capo2.txt"])
+        self.assertEqual((self.outdir / "song-capo2.txt").read_text(encoding="utf-8"), "D A\n")
+
+    def test_accepted_upload_replaces_archived_file_in_overwrite_mode(self):
+        client = self._client()
+        with mock.patch.dict(os.environ, {"OUTPUT_CONFLICT_MODE": "overwrite"}):
+            client.post("/generate", data={"capo": "2", "title": "Song", "pdf": "0", "text": "C G\n"})
+            self._post(client, [("new.txt", b"Am\n")], title="Song")
+
+        self.assertEqual(self._outputs(), ["song-capo2.txt"])
+        self.assertEqual((self.outdir / "song-capo2.txt").read_text(encoding="utf-8"), "Bm\n")
+
+    def test_suffixed_upload_is_reported(self):
+        client = self._client()
+        self._post(client, [("song.txt", b"C\n")])
+        resp = self._post(client, [("song.txt", b"G\n")])
+
+        self.assertEqual(self._outputs(), ["song-capo2-2.txt", "song-capo2.txt"])
+        self.assertIn(b"Existing file detected. Saved as song-capo2-2.*", resp.data)
+
+    def test_empty_and_wrong_extension_files_are_skipped(self):
+        client = self._client()
+        resp = self._post(client, [("empty.txt", b""), ("notes.doc", b"C\n"), ("ok.txt", b"C\n")])
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._outputs(), ["ok-capo2.txt"])
+        self.assertIn(b"empty.txt: file is empty.", resp.data)
+        self.assertIn(b"notes.doc: only .txt and .pro files are supported.", resp.data)
+
+    def test_max_upload_files(self):
+        client = self._client(MAX_UPLOAD_FILES=2)
+        resp = self._post(client, [("a.txt", b"C\n"), ("b.txt", b"C\n"), ("c.txt", b"C\n")])
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(self._outputs(), [])
+        self.assertEqual(self._flashes(client), ["Too many files. Upload at most 2 files at once."])
+
+    def test_text_and_files_together_are_rejected(self):
+        client = self._client()
+        resp = self._post(client, [("a.txt", b"C\n")], text="G\n")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self._outputs(), [])
+        self.assertIn(b"Paste text or upload files, not both.", resp.data)
+
+    def test_preview_pdf_rejects_files(self):
+        client = self._client()
+        data = {"capo": "2", "text": "", "files": [(BytesIO(b"C\n"), "a.txt")]}
+        resp = client.post("/render.pdf", data=data, content_type="multipart/form-data")
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertIn("Preview PDF only uses pasted text", self._flashes(client)[0])
+
+
+class PastedTextTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"DATA_DIR": self._tmp.name})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def test_form_memory_follows_configured_text_limit(self):
+        app = create_app({"MAX_TEXT_LENGTH": 1_000_000, "MAX_CONTENT_LENGTH": 8_000_000})
+        self.assertGreaterEqual(app.config["MAX_FORM_MEMORY_SIZE"], 4_000_000)
+
+        explicit = create_app({"MAX_TEXT_LENGTH": 1_000_000, "MAX_FORM_MEMORY_SIZE": 123_456})
+        self.assertEqual(explicit.config["MAX_FORM_MEMORY_SIZE"], 123_456)
+
+    def test_large_multipart_paste_is_accepted(self):
+        app = create_app({"TESTING": True, "MAX_TEXT_LENGTH": 1_000_000, "MAX_CONTENT_LENGTH": 8_000_000})
+        text = "C G\n" * 230_000
+        # Close the builder so the body the test client spools to disk is released.
+        builder = EnvironBuilder(
+            app,
+            "/generate",
+            method="POST",
+            data={"capo": "2", "pdf": "0", "text": text},
+            content_type="multipart/form-data",
+        )
+        try:
+            resp = app.test_client().open(builder)
+        finally:
+            builder.close()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue((Path(self._tmp.name) / "outputs" / "chord-sheet-capo2.txt").exists())
+
+    def test_large_input_is_not_echoed_and_preview_ends_on_a_line(self):
+        client = create_app({"TESTING": True, "PREVIEW_TEXT_LENGTH": 1_000}).test_client()
+        # Under the limit as pasted, over it once transposed (C -> Db).
+        text = "C C C C C C\n" * 83
+        self.assertLess(len(text), 1_000)
+
+        resp = client.post("/generate", data={"capo": "1", "pdf": "0", "text": text})
+        body = resp.get_data(as_text=True)
+
+        self.assertIn("preview truncated", body)
+        self.assertNotIn("C C C C C C", body)
+        preview = body.split('<pre id="transposed-result">', 1)[1].split("</pre>", 1)[0]
+        self.assertLessEqual(len(preview), 1_000)
+        self.assertTrue(preview.endswith("Db Db Db Db Db Db\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
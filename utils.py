@@ -1,7 +1,10 @@
 ﻿import os
 import re
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from types import MappingProxyType
+from typing import BinaryIO, Iterable
 
 SUPPORTED_OUTPUT_EXTENSIONS = {"txt", "pdf"}
 
@@ -143,30 +146,59 @@ def _pdf_int_setting(name: str, default: int, minimum: int, maximum: int, overri
     return value
 
 
+# (option key, env var, default, minimum, maximum)
+PDF_LAYOUT_SETTINGS = (
+    ("left_margin", "PDF_LEFT_MARGIN", 54, 20, 200),
+    ("top_margin", "PDF_TOP_MARGIN", 62, 20, 200),
+    ("bottom_margin", "PDF_BOTTOM_MARGIN", 54, 20, 200),
+    ("title_size", "PDF_TITLE_SIZE", 14, 8, 48),
+    ("body_size", "PDF_BODY_SIZE", 10, 6, 24),
+    ("line_height", "PDF_LINE_HEIGHT", 12, 8, 40),
+    ("max_width_chars", "PDF_MAX_WIDTH_CHARS", 110, 40, 300),
+)
+
+PAGE_MARKER_RE = re.compile(r"^\s*Page\s+\d+\s*/\s*\d+\s*$", re.IGNORECASE)
+
+PDF_TITLE_FONT = "Helvetica-Bold"
+PDF_BODY_FONT = "Courier"
+PDF_PAGE_NUMBER_FONT = "Helvetica"
+
+# Renderers are cached per layout; a handful of distinct layouts is plenty.
+_PDF_RENDERER_CACHE_LIMIT = 8
+_pdf_renderer_cache: dict = {}
+_pdf_renderer_lock = threading.Lock()
+
+
 def get_pdf_layout_options(overrides: dict | None = None) -> dict:
     """
     Return validated PDF layout options from env/overrides.
     """
     return {
-        "left_margin": _pdf_int_setting("PDF_LEFT_MARGIN", 54, 20, 200, overrides),
-        "top_margin": _pdf_int_setting("PDF_TOP_MARGIN", 62, 20, 200, overrides),
-        "bottom_margin": _pdf_int_setting("PDF_BOTTOM_MARGIN", 54, 20, 200, overrides),
-        "title_size": _pdf_int_setting("PDF_TITLE_SIZE", 14, 8, 48, overrides),
-        "body_size": _pdf_int_setting("PDF_BODY_SIZE", 10, 6, 24, overrides),
-        "line_height": _pdf_int_setting("PDF_LINE_HEIGHT", 12, 8, 40, overrides),
-        "max_width_chars": _pdf_int_setting("PDF_MAX_WIDTH_CHARS", 110, 40, 300, overrides),
+        key: _pdf_int_setting(env_name, default, minimum, maximum, overrides)
+        for key, env_name, default, minimum, maximum in PDF_LAYOUT_SETTINGS
     }
 
 
-def make_pdf(text: str, pdf_path: Path, title: str, layout_overrides: dict | None = None):
+def _pdf_layout_key(overrides: dict | None = None) -> tuple:
     """
-    Common PDF generation logic used by both Web UI and CLI.
+    Cache key for a renderer: the validated layout it would use.
     """
+    return tuple(get_pdf_layout_options(overrides).values())
+
+
+def _load_reportlab():
     try:
         from reportlab.lib.pagesizes import LETTER
+        from reportlab.pdfbase import pdfmetrics
         from reportlab.pdfgen import canvas
     except ImportError as exc:
         raise RuntimeError("PDF generation requires reportlab. Install dependencies from requirements.txt") from exc
+    return LETTER, pdfmetrics, canvas
+
+
+@lru_cache(maxsize=None)
+def _numbered_canvas_class():
+    _, _, canvas = _load_reportlab()
 
     class NumberedCanvas(canvas.Canvas):
         """
@@ -193,73 +225,135 @@ def make_pdf(text: str, pdf_path: Path, title: str, layout_overrides: dict | Non
         def _draw_page_number(self, total_pages: int):
             page_num = self.getPageNumber()
             page_text = f"Page {page_num} of {total_pages}"
-            self.setFont("Helvetica", 9)
+            self.setFont(PDF_PAGE_NUMBER_FONT, 9)
 
             page_width, _ = self._pagesize
             right_margin = 54
             bottom_margin = 54
             self.drawRightString(page_width - right_margin, bottom_margin - 18, page_text)
 
-    layout = get_pdf_layout_options(layout_overrides)
+    return NumberedCanvas
+
 
-    c = NumberedCanvas(str(pdf_path), pagesize=LETTER)
-    width, height = LETTER
+class PdfRenderer:
+    """
+    Reusable PDF renderer.
+
+    Layout options, the canvas class and font metrics are resolved once at
+    construction; render() only does per-document work. Use
+    get_pdf_renderer() to share instances across calls.
+    """
 
-    left_margin = layout["left_margin"]
-    top_margin = layout["top_margin"]
-    bottom_margin = layout["bottom_margin"]
-    content_x = left_margin + 10
+    def __init__(self, layout_overrides: dict | None = None):
+        pagesize, pdfmetrics, _ = _load_reportlab()
+        # Shared across threads through the cache, so keep it read-only.
+        self.layout = MappingProxyType(get_pdf_layout_options(layout_overrides))
+        self.pagesize = pagesize
+        self.canvas_class = _numbered_canvas_class()
 
-    title_font = "Helvetica-Bold"
-    title_size = layout["title_size"]
-    body_font = "Courier"
-    body_size = layout["body_size"]
-    line_height = layout["line_height"]
+        # Resolve font metrics up front so the first render does not pay for it.
+        for font_name in (PDF_TITLE_FONT, PDF_BODY_FONT, PDF_PAGE_NUMBER_FONT):
+            pdfmetrics.getFont(font_name)
 
-    c.setTitle(title)
-    title_y = height - top_margin
+        width, height = pagesize
+        self.width = width
+        self.title_y = height - self.layout["top_margin"]
+        self.body_start_y = self.title_y - (self.layout["line_height"] * 2)
+        self.content_x = self.layout["left_margin"] + 10
 
-    page_marker_re = re.compile(r"^\s*Page\s+\d+\s*/\s*\d+\s*$", re.IGNORECASE)
+    def render(self, text: str | Iterable[str], pdf_path: Path | BinaryIO, title: str):
+        """
+        Render text to pdf_path, a filesystem path or writable binary sink
+        (for example io.BytesIO or sys.stdout.buffer); sinks are written
+        to but not closed.
 
-    def draw_header():
-        c.setFont(title_font, title_size)
-        c.drawCentredString(width / 2, title_y, title)
-        c.setFont(body_font, body_size)
+        text may also be an iterable of lines without line endings, so large
+        sheets can be rendered straight from a file.
+        """
+        layout = self.layout
+        target = pdf_path if callable(getattr(pdf_path, "write", None)) else str(pdf_path)
+        c = self.canvas_class(target, pagesize=self.pagesize)
+
+        bottom_margin = layout["bottom_margin"]
+        title_size = layout["title_size"]
+        body_size = layout["body_size"]
+        line_height = layout["line_height"]
+        max_width_chars = layout["max_width_chars"]
+        content_x = self.content_x
+        title_x = self.width / 2
+        title_y = self.title_y
+
+        c.setTitle(title)
+
+        def draw_header():
+            c.setFont(PDF_TITLE_FONT, title_size)
+            c.drawCentredString(title_x, title_y, title)
+            c.setFont(PDF_BODY_FONT, body_size)
+
+        def new_page():
+            nonlocal y
+            c.showPage()
+            draw_header()
+            y = self.body_start_y
 
-    def new_page():
-        nonlocal y
-        c.showPage()
         draw_header()
-        y = title_y - (line_height * 2)
+        y = self.body_start_y
+        wrote_anything = False
 
-    draw_header()
-    y = title_y - (line_height * 2)
+        lines = text.splitlines() if isinstance(text, str) else text
+        for raw_line in lines:
+            if PAGE_MARKER_RE.match(raw_line):
+                new_page()
+                continue
 
-    max_width_chars = layout["max_width_chars"]
-    wrote_anything = False
+            line = raw_line
+            while True:
+                if y < bottom_margin:
+                    new_page()
 
-    for raw_line in text.splitlines():
-        if page_marker_re.match(raw_line):
-            new_page()
-            continue
+                chunk = line[:max_width_chars]
+                remainder = line[max_width_chars:]
 
-        line = raw_line
-        while True:
-            if y < bottom_margin:
-                new_page()
+                c.drawString(content_x, y, chunk)
+                wrote_anything = True
+                y -= line_height
+
+                if not remainder:
+                    break
+                line = remainder
+
+        if wrote_anything:
+            c.showPage()
+
+        c.save()
 
-            chunk = line[:max_width_chars]
-            remainder = line[max_width_chars:]
 
-            c.drawString(content_x, y, chunk)
-            wrote_anything = True
-            y -= line_height
+def get_pdf_renderer(layout_overrides: dict | None = None) -> PdfRenderer:
+    """
+    Return a shared PdfRenderer for the current env/overrides.
+
+    Renderers are keyed on the validated layout, so a new one is built
+    whenever the PDF_* env vars or overrides resolve to a different layout.
+    """
+    key = _pdf_layout_key(layout_overrides)
+    renderer = _pdf_renderer_cache.get(key)
+    if renderer is not None:
+        return renderer
 
-            if not remainder:
-                break
-            line = remainder
+    renderer = PdfRenderer(layout_overrides)
+    with _pdf_renderer_lock:
+        if len(_pdf_renderer_cache) >= _PDF_RENDERER_CACHE_LIMIT:
+            _pdf_renderer_cache.clear()
+        _pdf_renderer_cache[key] = renderer
+    return renderer
 
-    if wrote_anything:
-        c.showPage()
 
-    c.save()
+def make_pdf(text: str | Iterable[str], pdf_path: Path | BinaryIO, title: str, layout_overrides: dict | None = None):
+    """
+    Common PDF generation logic used by both Web UI and CLI.
+
+    pdf_path may be a filesystem path or any writable binary sink
+    (for example io.BytesIO or sys.stdout.buffer); sinks are written
+    to but not closed.
+    """
+    get_pdf_renderer(layout_overrides).render(text, pdf_path, title)
@@ -1,6 +1,10 @@
 ﻿import os
+import codecs
+import tempfile
+from io import BytesIO
 from datetime import datetime
-from flask import Flask, request, render_template, send_from_directory, redirect, url_for, flash, current_app
+from pathlib import Path
+from flask import Flask, request, render_template, send_file, send_from_directory, redirect, url_for, flash, current_app
 
 from transpose_chords import transpose_text
 from utils import (
@@ -14,6 +18,8 @@ from utils import (
 )
 
 DEFAULT_FLASK_SECRET = "capotokeys-local"
+UPLOAD_EXTENSIONS = {"txt", "pro"}
+UPLOAD_CHUNK_BYTES = 64 * 1024
 
 
 def _env_int(name: str, default: int, minimum: int | None = None, maximum: int | None = None) -> int:
@@ -46,6 +52,158 @@ def _validate_runtime_config() -> None:
             raise RuntimeError("FLASK_SECRET must be set to a strong value in production.")
 
 
+def _form_flag(name: str, default: bool) -> bool:
+    raw = request.form.get(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def _read_capo_form():
+    capo = request.form.get("capo", "0")
+    try:
+        capo_i = int(capo)
+        if capo_i < 0 or capo_i > 11:
+            raise ValueError()
+    except Exception:
+        return None, "Capo must be a number from 0 to 11."
+    return capo_i, None
+
+
+def _read_sheet_form():
+    """
+    Read and validate the text/title/capo fields shared by the generate routes.
+
+    Returns (text, title, capo, error); error is a user-facing message or None.
+    """
+    text = request.form.get("text", "")
+    title = request.form.get("title", "") or "Chord Sheet"
+
+    capo_i, err = _read_capo_form()
+    if err:
+        return text, title, None, err
+
+    if not text.strip():
+        return text, title, capo_i, "Paste some chord sheet text first."
+
+    max_text_length = current_app.config["MAX_TEXT_LENGTH"]
+    if len(text) > max_text_length:
+        return text, title, capo_i, f"Input is too large. Maximum allowed text length is {max_text_length} characters."
+
+    return text, title, capo_i, None
+
+
+def _uploaded_files():
+    return [f for f in request.files.getlist("files") if f and f.filename]
+
+
+def _preview_text(text: str, limit: int) -> str:
+    """
+    Cut text to at most limit characters, ending on a whole line where possible.
+    """
+    cut = text.rfind("\n", 0, limit) + 1
+    return text[:cut] if cut else text[:limit]
+
+
+def _transpose_upload(stream, sink, semitones: int, max_chars: int) -> tuple[bool, str | None]:
+    """
+    Transpose an uploaded binary stream into a text sink chunk by chunk.
+
+    Only complete lines are transposed so chords never straddle a chunk
+    boundary. Reading stops as soon as max_chars is exceeded.
+
+    Returns (has_content, error).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    total = 0
+    has_content = False
+
+    while True:
+        raw = stream.read(UPLOAD_CHUNK_BYTES)
+        chunk = decoder.decode(raw, final=not raw)
+        total += len(chunk)
+        if total > max_chars:
+            return has_content, f"exceeds the maximum of {max_chars} characters"
+        if not has_content and chunk.strip():
+            has_content = True
+
+        pending += chunk
+        if raw:
+            cut = pending.rfind("\n") + 1
+            if not cut:
+                continue
+            ready, pending = pending[:cut], pending[cut:]
+        else:
+            ready, pending = pending, ""
+
+        if ready:
+            sink.write(transpose_text(ready, semitones))
+        if not raw:
+            return has_content, None
+
+
+def _save_uploads(uploads, capo_i: int, title: str, want_pdf: bool):
+    """
+    Transpose uploaded chord sheets straight into the outputs directory.
+
+    Each upload is written to a temporary file in the outputs directory and
+    only moved into place once it is valid, so a rejected upload never
+    touches an archived file of the same name (e.g. in overwrite mode).
+
+    Returns (saved, messages): saved is a list of dicts for the template and
+    messages a list of user-facing notes for skipped or renamed files.
+    """
+    outdir = outputs_dir()
+    conflict_mode = os.getenv("OUTPUT_CONFLICT_MODE", "suffix")
+    max_text_length = current_app.config["MAX_TEXT_LENGTH"]
+    saved = []
+    messages = []
+
+    for upload in uploads:
+        source = upload.filename.replace("\\", "/").rsplit("/", 1)[-1]
+        stem, _, ext = source.rpartition(".")
+        if not stem or ext.lower() not in UPLOAD_EXTENSIONS:
+            messages.append(f"{source}: only .txt and .pro files are supported.")
+            continue
+
+        sheet_title = title if title and len(uploads) == 1 else stem
+        base_stem = f"{slugify(sheet_title)}-capo{capo_i}"
+        output_exts = ["txt", "pdf"] if want_pdf else ["txt"]
+        final_stem = resolve_output_stem(outdir, base_stem, output_exts, mode=conflict_mode)
+        txt_path = outdir / f"{final_stem}.txt"
+
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=outdir, prefix=f".{final_stem}.", suffix=".part", delete=False
+        ) as sink:
+            part_path = Path(sink.name)
+            try:
+                has_content, err = _transpose_upload(upload.stream, sink, capo_i, max_text_length)
+            except BaseException:
+                sink.close()
+                part_path.unlink(missing_ok=True)
+                raise
+
+        if err or not has_content:
+            part_path.unlink(missing_ok=True)
+            messages.append(f"{source}: {err or 'file is empty'}.")
+            continue
+
+        os.replace(part_path, txt_path)
+        if final_stem != base_stem and conflict_mode.strip().lower() != "overwrite":
+            messages.append(f"Existing file detected. Saved as {final_stem}.*")
+
+        pdf_name = None
+        if want_pdf:
+            pdf_name = f"{final_stem}.pdf"
+            with open(txt_path, encoding="utf-8") as fh:
+                make_pdf((line.rstrip("\r\n") for line in fh), outdir / pdf_name, title=sheet_title)
+
+        saved.append({"source": source, "txt_name": txt_path.name, "pdf_name": pdf_name})
+
+    return saved, messages
+
+
 def _safe_output_target(filename: str):
     outdir = outputs_dir()
     target = outdir / filename
@@ -62,14 +220,21 @@ def _safe_output_target(filename: str):
 
 
 def _collect_output_groups(outdir, list_limit: int):
-    files = sorted(outdir.glob("*"), key=lambda p: p.stat().st_mtime, reverse=True)[:list_limit]
+    entries = []
+    for p in outdir.glob("*"):
+        try:
+            entries.append((p, p.stat()))
+        except FileNotFoundError:
+            # Removed by a concurrent delete between listing and stat.
+            continue
+
+    entries.sort(key=lambda e: e[1].st_mtime, reverse=True)
     groups_by_key = {}
 
-    for p in files:
+    for p, stat in entries[:list_limit]:
         if not is_supported_output_file(p):
             continue
 
-        stat = p.stat()
         stem = p.stem
         ext = p.suffix.lower().lstrip(".")
         group_key, label = describe_output_group(stem)
@@ -118,53 +283,128 @@ def _register_routes(app: Flask) -> None:
 
     @app.post("/generate")
     def generate():
-        text = request.form.get("text", "")
-        title = request.form.get("title", "") or "Chord Sheet"
-        capo = request.form.get("capo", "0")
-
-        try:
-            capo_i = int(capo)
-            if capo_i < 0 or capo_i > 11:
-                raise ValueError()
-        except Exception:
-            flash("Capo must be a number from 0 to 11.")
-            return redirect(url_for("home"))
-
-        if not text.strip():
-            flash("Paste some chord sheet text first.")
-            return redirect(url_for("home"))
-
-        max_text_length = current_app.config["MAX_TEXT_LENGTH"]
-        if len(text) > max_text_length:
-            flash(f"Input is too large. Maximum allowed text length is {max_text_length} characters.")
+        uploads = _uploaded_files()
+        if uploads and request.form.get("text", "").strip():
+            flash("Paste text or upload files, not both. Clear one and try again.")
+            text = request.form.get("text", "")
+            return render_template(
+                "index.html",
+                capo=request.form.get("capo", "0"),
+                title=request.form.get("title", ""),
+                text="" if len(text) > current_app.config["PREVIEW_TEXT_LENGTH"] else text,
+                result=None,
+                txt_name=None,
+                pdf_name=None,
+            ), 400
+        if uploads:
+            return generate_from_uploads(uploads)
+
+        text, title, capo_i, err = _read_sheet_form()
+        if err:
+            flash(err)
             return redirect(url_for("home"))
 
+        want_pdf = _form_flag("pdf", True)
         result = transpose_text(text, capo_i)
 
         outdir = outputs_dir()
         conflict_mode = os.getenv("OUTPUT_CONFLICT_MODE", "suffix")
         base_stem = f"{slugify(title)}-capo{capo_i}"
-        final_stem = resolve_output_stem(outdir, base_stem, ["txt", "pdf"], mode=conflict_mode)
+        output_exts = ["txt", "pdf"] if want_pdf else ["txt"]
+        final_stem = resolve_output_stem(outdir, base_stem, output_exts, mode=conflict_mode)
 
         txt_name = f"{final_stem}.txt"
-        pdf_name = f"{final_stem}.pdf"
+        pdf_name = f"{final_stem}.pdf" if want_pdf else None
 
         (outdir / txt_name).write_text(result, encoding="utf-8")
-        make_pdf(result, outdir / pdf_name, title=title)
+        if pdf_name:
+            make_pdf(result, outdir / pdf_name, title=title)
 
         if final_stem != base_stem and conflict_mode.strip().lower() != "overwrite":
             flash(f"Existing file detected. Saved as {final_stem}.*")
 
+        # Large inputs are not echoed back; the full result is in the TXT.
+        preview_limit = current_app.config["PREVIEW_TEXT_LENGTH"]
+        large_input = max(len(text), len(result)) > preview_limit
+
         return render_template(
             "index.html",
             capo=capo_i,
             title=title,
-            text=text,
-            result=result,
+            text="" if large_input else text,
+            result=_preview_text(result, preview_limit) if large_input else result,
+            preview_truncated=large_input,
             txt_name=txt_name,
             pdf_name=pdf_name,
         )
 
+    def generate_from_uploads(uploads):
+        max_files = current_app.config["MAX_UPLOAD_FILES"]
+        if len(uploads) > max_files:
+            flash(f"Too many files. Upload at most {max_files} files at once.")
+            return redirect(url_for("home"))
+
+        capo_i, err = _read_capo_form()
+        if err:
+            flash(err)
+            return redirect(url_for("home"))
+
+        title = request.form.get("title", "").strip()
+        if title and len(uploads) > 1:
+            flash("Song name is only used for a single upload; each file was named after its filename.")
+        saved, messages = _save_uploads(uploads, capo_i, title, _form_flag("pdf", True))
+        for message in messages:
+            flash(message)
+        if not saved:
+            return redirect(url_for("home"))
+
+        return render_template(
+            "index.html",
+            capo=capo_i,
+            title=title,
+            text="",
+            result=None,
+            uploads=saved,
+            txt_name=None,
+            pdf_name=None,
+        )
+
+    @app.post("/render.pdf")
+    def render_pdf():
+        if _uploaded_files():
+            flash("Preview PDF only uses pasted text. Use Generate Transposition for uploaded files.")
+            return redirect(url_for("home"))
+
+        text, title, capo_i, err = _read_sheet_form()
+        if err:
+            flash(err)
+            return redirect(url_for("home"))
+
+        result = transpose_text(text, capo_i)
+        base_stem = f"{slugify(title)}-capo{capo_i}"
+
+        buf = BytesIO()
+        make_pdf(result, buf, title=title)
+
+        if _form_flag("archive", False):
+            outdir = outputs_dir()
+            conflict_mode = os.getenv("OUTPUT_CONFLICT_MODE", "suffix")
+            final_stem = resolve_output_stem(outdir, base_stem, ["txt", "pdf"], mode=conflict_mode)
+            (outdir / f"{final_stem}.txt").write_text(result, encoding="utf-8")
+            (outdir / f"{final_stem}.pdf").write_bytes(buf.getbuffer())
+
+            if final_stem != base_stem and conflict_mode.strip().lower() != "overwrite":
+                flash(f"Existing file detected. Saved as {final_stem}.*")
+            base_stem = final_stem
+
+        buf.seek(0)
+        return send_file(
+            buf,
+            mimetype="application/pdf",
+            as_attachment=_form_flag("download", False),
+            download_name=f"{base_stem}.pdf",
+        )
+
     @app.get("/outputs")
     def list_outputs():
         outdir = outputs_dir()
@@ -246,10 +486,16 @@ def create_app(config: dict | None = None) -> Flask:
     app.config["MAX_CONTENT_LENGTH"] = _env_int("MAX_REQUEST_BYTES", 1_048_576, minimum=1_024, maximum=20_000_000)
     app.config["MAX_TEXT_LENGTH"] = _env_int("MAX_TEXT_LENGTH", 200_000, minimum=1_000, maximum=1_000_000)
     app.config["OUTPUT_LIST_LIMIT"] = _env_int("OUTPUT_LIST_LIMIT", 300, minimum=1, maximum=5_000)
+    app.config["MAX_UPLOAD_FILES"] = _env_int("MAX_UPLOAD_FILES", 10, minimum=1, maximum=100)
+    app.config["PREVIEW_TEXT_LENGTH"] = _env_int("PREVIEW_TEXT_LENGTH", 20_000, minimum=1_000, maximum=1_000_000)
 
     if config:
         app.config.update(config)
 
+    if not config or "MAX_FORM_MEMORY_SIZE" not in config:
+        # Pasted text arrives as an in-memory form field; allow up to 4 UTF-8 bytes per character.
+        app.config["MAX_FORM_MEMORY_SIZE"] = max(500_000, app.config["MAX_TEXT_LENGTH"] * 4 + 4_096)
+
     _register_routes(app)
     return app
 